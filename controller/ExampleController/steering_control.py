@@ -4,12 +4,14 @@ Minimal Steering Control
 Drives a servo via Adafruit ServoKit (PCA9685). Only steering angle.
 """
 
+import array
 import logging
 import sys
 
 # Try to import Adafruit ServoKit for servo controller
 try:
     import board
+    from adafruit_bus_device.i2c_device import I2CDevice
     from adafruit_servokit import ServoKit
     SERVO_KIT_AVAILABLE = True
 except ImportError:
@@ -27,21 +29,50 @@ class SteeringController:
     SERVO_SAFE_MAX_PERCENT = 90.0  # Maximum safe angle
     SERVO_CENTER_PERCENT = 50.0    # Center position
     
+    # PCA9685 wiring and servo pulse range
+    PCA9685_ADDRESS = 0x40
+    PWM_FREQ_HZ = 50
+    SERVO_CHANNEL = 0
+    SERVO_MIN_US = 1000
+    SERVO_MAX_US = 2000
+    LED0_ON_L = 0x06               # First channel register block (ON_L, ON_H, OFF_L, OFF_H)
+    
     def __init__(self):
         self.servo_kit = None
+        self._i2c_device = None
+        self._i2c_write = None           # bound self._i2c_device.write, cached for the hot path
         self.current_steering = 0.0      # -1.0 to 1.0
+        self._current_index = 1000       # current_steering quantized to LUT index
+        self._last_angle = None          # last angle written to the servo
+        
+        # Precompute angles for every wire-resolution input (-1.000 .. 1.000 in 0.001 steps)
+        self._angle_lut = array.array('B', [self._compute_angle(i / 1000.0) for i in range(-1000, 1001)])
+        # Precompute the PCA9685 register write for every angle (0 .. 180)
+        self._angle_frames = [self._compute_frame(angle) for angle in range(181)]
         
         if SERVO_KIT_AVAILABLE:
             self.initialize_servo_kit()
+        
+        self._status = {
+            'steering': 0.0,
+            'servo_kit_available': SERVO_KIT_AVAILABLE,
+            'servo_kit_initialized': self.servo_kit is not None
+        }
     
     def initialize_servo_kit(self):
         """Initialize Adafruit ServoKit for steering control via I2C"""
         try:
             # Initialize ServoKit with 16 channels, I2C address 0x40, 50Hz frequency
-            self.servo_kit = ServoKit(channels=16, i2c=board.I2C(), address=0x40, frequency=50)
+            i2c = board.I2C()
+            self.servo_kit = ServoKit(channels=16, i2c=i2c, address=self.PCA9685_ADDRESS, frequency=self.PWM_FREQ_HZ)
             
             # Set pulse width range for the 35kg servo on channel 0
-            self.servo_kit.servo[0].set_pulse_width_range(1000, 2000)
+            self.servo_kit.servo[self.SERVO_CHANNEL].set_pulse_width_range(self.SERVO_MIN_US, self.SERVO_MAX_US)
+            
+            # ServoKit has configured prescaler and auto-increment; angle updates
+            # bypass it and write the channel's registers directly
+            self._i2c_device = I2CDevice(i2c, self.PCA9685_ADDRESS)
+            self._i2c_write = self._i2c_device.write
             
             logger.info("ServoKit initialized successfully via I2C")
             
@@ -49,8 +80,25 @@ class SteeringController:
             logger.error(f"ServoKit initialization failed: {e}")
             SERVO_KIT_AVAILABLE = False
     
+    @staticmethod
+    def _lut_index(value: float) -> int:
+        """Quantize a value in [-1, 1] to its lookup table index (0 .. 2000).
+        Out-of-range values (including +/-inf) are clamped first; NaN maps to the center index.
+        """
+        if value != value:
+            return 1000
+        if value > 1.0:
+            value = 1.0
+        elif value < -1.0:
+            value = -1.0
+        return int(round(value * 1000.0)) + 1000
+    
     def map_steering_to_angle(self, steering_value: float) -> int:
-        """Map steering value (-1.0 to 1.0) to servo angle."""
+        """Map steering value (-1.0 to 1.0) to servo angle via the precomputed table."""
+        return self._angle_lut[self._lut_index(float(steering_value))]
+    
+    def _compute_angle(self, steering_value: float) -> int:
+        """Compute servo angle for a steering value (used to build the lookup table)."""
         if abs(steering_value) < 0.05:  # Deadzone
             return 90
         
@@ -70,32 +118,60 @@ class SteeringController:
         
         return angle
     
+    def _compute_frame(self, angle: int) -> bytes:
+        """Build the 5-byte PCA9685 write (register + ON/OFF ticks) for a servo angle."""
+        pulse_us = self.SERVO_MIN_US + (self.SERVO_MAX_US - self.SERVO_MIN_US) * angle / 180.0
+        tick = int(pulse_us * 4096 * self.PWM_FREQ_HZ / 1_000_000)
+        return bytes([self.LED0_ON_L + 4 * self.SERVO_CHANNEL, 0, 0, tick & 0xFF, (tick >> 8) & 0x0F])
+    
+    def _write_angle(self, angle: int):
+        """Write a servo angle to the PCA9685 in a single I2C transaction."""
+        with self._i2c_device:
+            self._i2c_write(self._angle_frames[angle])
+    
     def set_steering(self, steering_value: float):
         """Set steering target value in [-1, 1]."""
         self.current_steering = max(-1.0, min(1.0, float(steering_value)))
+        self._current_index = self._lut_index(self.current_steering)
+    
+    def set_steering_raw(self, ste_i16: int):
+        """Set steering target from a wire value scaled by 1000 (-1000 .. 1000)."""
+        if ste_i16 > 1000:
+            ste_i16 = 1000
+        elif ste_i16 < -1000:
+            ste_i16 = -1000
+        self._current_index = ste_i16 + 1000
+        self.current_steering = ste_i16 * 0.001
     
     def apply_steering(self):
         """Apply current steering value to hardware"""
         if not SERVO_KIT_AVAILABLE or not self.servo_kit:
             # Simulation mode: nothing to write
-            _ = self.map_steering_to_angle(self.current_steering)
+            _ = self._angle_lut[self._current_index]
             return
         
         try:
-            # Apply steering using ServoKit
-            steering_angle = self.map_steering_to_angle(self.current_steering)
-            self.servo_kit.servo[0].angle = steering_angle  # Channel 0
+            # Apply steering with a direct register write
+            steering_angle = self._angle_lut[self._current_index]
+            if steering_angle == self._last_angle:
+                # Unchanged since last write: skip the I2C transaction
+                return
+            self._write_angle(steering_angle)
+            self._last_angle = steering_angle
                 
         except Exception as e:
+            self._last_angle = None
             logger.error(f"Steering control error: {e}")
     
     def center_steering(self):
         """Center the steering servo"""
         if SERVO_KIT_AVAILABLE and self.servo_kit:
             try:
-                self.servo_kit.servo[0].angle = 90  # Center position
+                self._write_angle(90)  # Center position
+                self._last_angle = 90
                 logger.info("Steering centered to 90 degrees")
             except Exception as e:
+                self._last_angle = None
                 logger.error(f"Error centering steering: {e}")
     
     def cleanup(self):
@@ -108,9 +184,8 @@ class SteeringController:
                 logger.error(f"Error during steering cleanup: {e}")
     
     def get_status(self):
-        """Get current steering status"""
-        return {
-            'steering': self.current_steering,
-            'servo_kit_available': SERVO_KIT_AVAILABLE,
-            'servo_kit_initialized': self.servo_kit is not None
-        }
+        """Get current steering status.
+        The same dict is updated and returned on every call; callers must not mutate it.
+        """
+        self._status['steering'] = self.current_steering
+        return self._status
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """
 Minimal Throttle Control
-Drives an ESC on a single GPIO using pigpio. Only forward/backward.
+Drives an ESC on a single GPIO using pigpio hardware PWM. Only forward/backward.
 """
 
+import array
 import logging
 import sys
+import time
 
 # Try to import pigpio for hardware control
 try:
@@ -28,8 +30,8 @@ class ThrottleController:
       - cleanup(): release resources
     """
 
-    # GPIO pin (BCM numbering)
-    ESC_GPIO = 18  # physical pin 12
+    # GPIO pin (BCM numbering); must be hardware-PWM capable
+    ESC_GPIO = 18  # physical pin 12 (PWM0)
 
     # ESC pulse width ranges (microseconds)
     MIN_US = 1000      # Full reverse
@@ -38,12 +40,31 @@ class ThrottleController:
     DB_LOW = 1485      # Deadband below neutral
     DB_HIGH = 1515     # Deadband above neutral
 
+    # Input deadzone, in wire units (throttle x 1000): |v| < 0.05 maps to NEUTRAL;
+    # baked into the pulse LUT, so the integer paths get it with no extra compare
+    DEADZONE_I16 = 50
+
     # PWM frequencies
     ESC_FREQ_HZ = 50   # ESC expects ~50 Hz
 
+    # The ESC samples one pulse per 20 ms frame; rate-limited callers (the vehicle
+    # actuator thread) defer faster writes, which would never be seen
+    MIN_WRITE_INTERVAL_S = 0.018
+
     def __init__(self):
         self.pi = None
+        self._set_pwm = None         # bound self.pi.hardware_PWM, cached for the hot path
         self.current_throttle = 0.0  # -1.0 to 1.0
+        self._current_index = 1000   # current_throttle quantized to LUT index
+        self._last_pulse = None      # last pulse written to the ESC
+        self._last_write = 0.0       # time.monotonic() of the last write
+        self._deferred = False       # a rate-limited apply_throttle() held back a change
+        # Precompute pulses for every wire-resolution input (-1.000 .. 1.000 in 0.001 steps)
+        self._pulse_lut = array.array('H', [self._compute_pulse(i / 1000.0) for i in range(-1000, 1001)])
+        self._status = {
+            'throttle': 0.0,
+            'hardware_available': HARDWARE_AVAILABLE,
+        }
         if HARDWARE_AVAILABLE:
             self.initialize_hardware()
     
@@ -56,14 +77,10 @@ class ThrottleController:
                 HARDWARE_AVAILABLE = False
                 return
             
-            # Set GPIO modes
-            self.pi.set_mode(self.ESC_GPIO, pigpio.OUTPUT)
-            
-            # Set PWM frequencies
-            self.pi.set_PWM_frequency(self.ESC_GPIO, self.ESC_FREQ_HZ)
+            self._set_pwm = self.pi.hardware_PWM
             
-            # Initialize to neutral
-            self.pi.set_servo_pulsewidth(self.ESC_GPIO, self.NEUTRAL)
+            # Initialize to neutral (hardware_PWM switches the pin to its PWM function)
+            self._write_pulse(self.NEUTRAL)
             
             logger.info("ESC hardware initialized successfully")
             
@@ -71,13 +88,30 @@ class ThrottleController:
             logger.error(f"ESC hardware initialization failed: {e}")
             HARDWARE_AVAILABLE = False
     
+    @staticmethod
+    def _lut_index(value: float) -> int:
+        """Quantize a value in [-1, 1] to its lookup table index (0 .. 2000).
+        Out-of-range values (including +/-inf) are clamped first; NaN maps to the center index.
+        """
+        if value != value:
+            return 1000
+        if value > 1.0:
+            value = 1.0
+        elif value < -1.0:
+            value = -1.0
+        return int(round(value * 1000.0)) + 1000
+    
     def map_throttle_to_pulse(self, throttle_value: float) -> int:
-        """Map throttle value (-1.0 to 1.0) to ESC pulse width.
+        """Map throttle value (-1.0 to 1.0) to ESC pulse width via the precomputed table."""
+        return self._pulse_lut[self._lut_index(float(throttle_value))]
+    
+    def _compute_pulse(self, throttle_value: float) -> int:
+        """Compute ESC pulse width for a throttle value (used to build the lookup table).
         Deadzone near 0 maps to NEUTRAL.
         Negative values map to forward towards MAX_US; positive to reverse towards MIN_US.
         """
         v = float(throttle_value)
-        if abs(v) < 0.05:
+        if abs(v) < self.DEADZONE_I16 / 1000.0:
             return self.NEUTRAL
         if v < 0:  # forward
             lo = self.DB_HIGH + 5
@@ -93,31 +127,75 @@ class ThrottleController:
     def set_throttle(self, throttle_value: float):
         """Set throttle target value in [-1, 1]."""
         self.current_throttle = max(-1.0, min(1.0, float(throttle_value)))
+        self._current_index = self._lut_index(self.current_throttle)
+    
+    def set_throttle_raw(self, thr_i16: int):
+        """Set throttle target from a wire value scaled by 1000 (-1000 .. 1000)."""
+        if thr_i16 > 1000:
+            thr_i16 = 1000
+        elif thr_i16 < -1000:
+            thr_i16 = -1000
+        self._current_index = thr_i16 + 1000
+        self.current_throttle = thr_i16 * 0.001
     
-    def apply_throttle(self):
-        """Apply current throttle value to hardware"""
+    def _write_pulse(self, pulse: int):
+        """Output a pulse width (microseconds) on the ESC pin via hardware PWM."""
+        # Duty is in millionths of the period: pulse_us / (1e6 / freq) * 1e6
+        self._deferred = False
+        self._set_pwm(self.ESC_GPIO, self.ESC_FREQ_HZ, pulse * self.ESC_FREQ_HZ)
+        self._last_pulse = pulse
+        self._last_write = time.monotonic()
+    
+    def apply_throttle(self, rate_limited: bool = False):
+        """Apply current throttle value to hardware.
+        With rate_limited, a change within MIN_WRITE_INTERVAL_S of the previous write is
+        deferred; the caller must apply again after pending_write_delay().
+        """
         if not HARDWARE_AVAILABLE:
             # Simulation mode: nothing to write
-            _ = self.map_throttle_to_pulse(self.current_throttle)
+            _ = self._pulse_lut[self._current_index]
             return
         
         try:
             # Apply throttle
-            throttle_pulse = self.map_throttle_to_pulse(self.current_throttle)
-            self.pi.set_servo_pulsewidth(self.ESC_GPIO, throttle_pulse)
+            throttle_pulse = self._pulse_lut[self._current_index]
+            if throttle_pulse == self._last_pulse:
+                # Unchanged since last write: skip the pigpiod round trip
+                self._deferred = False
+                return
+            if (rate_limited
+                    and throttle_pulse != self.NEUTRAL
+                    and time.monotonic() - self._last_write < self.MIN_WRITE_INTERVAL_S):
+                # Within the current ESC frame: deferred, see pending_write_delay().
+                # Returning to neutral is never deferred.
+                self._deferred = True
+                return
+            self._write_pulse(throttle_pulse)
                 
         except Exception as e:
+            self._last_pulse = None
             logger.error(f"ESC control error: {e}")
     
+    def pending_write_delay(self):
+        """Seconds until a deferred throttle change can be written, or None if none is pending.
+        Callers that rate-limit apply_throttle() must call it again after this delay.
+        Failed writes are not reported here; they are retried on the next command.
+        """
+        if not self._deferred:
+            return None
+        return max(0.0, self._last_write + self.MIN_WRITE_INTERVAL_S - time.monotonic())
+    
     def stop_vehicle(self):
         """Emergency stop - set throttle to neutral"""
         self.current_throttle = 0.0
+        self._current_index = 1000
         
         if HARDWARE_AVAILABLE and self.pi:
             try:
-                self.pi.set_servo_pulsewidth(self.ESC_GPIO, self.NEUTRAL)
+                self._write_pulse(self.NEUTRAL)
                 logger.info("Vehicle stopped - ESC set to neutral")
             except Exception as e:
+                self._last_pulse = None
                 logger.error(f"Error stopping vehicle: {e}")
     
     def cleanup(self):
@@ -131,7 +209,8 @@ class ThrottleController:
                 logger.error(f"Error during ESC cleanup: {e}")
     
     def get_status(self):
-        return {
-            'throttle': self.current_throttle,
-            'hardware_available': HARDWARE_AVAILABLE,
-        }
+        """Get current throttle status.
+        The same dict is updated and returned on every call; callers must not mutate it.
+        """
+        self._status['throttle'] = self.current_throttle
+        return self._status
@@ -1,20 +1,38 @@
-from dataclasses import dataclass
+import threading
+import time
+from typing import Optional, Tuple
 
 # Use the example hardware-capable controllers
 from ExampleController.throttle_control import ThrottleController
 from ExampleController.steering_control import SteeringController
 
 
-@dataclass
 class VehicleController:
     """Minimal vehicle controller that directly drives GPIO via example controllers.
 
     Only throttle (forward/backward) and steering are supported.
     Safety gates are configured once on init: throttle lock held, emergency brake released,
     and power lock disabled so movement is permitted without extra inputs.
+
+    Hardware writes block (pigpio IPC, I2C), so callers on an event loop should
+    start() the actuator thread once and post commands with submit(); only the
+    latest command is kept and it is applied at most MAX_UPDATE_HZ times a second.
     """
 
-    def __post_init__(self) -> None:
+    MAX_UPDATE_HZ = 200
+
+    __slots__ = (
+        'throttle',
+        'steering',
+        '_latest_cmd',
+        '_cmd_lock',
+        '_cmd_event',
+        '_hw_lock',
+        '_running',
+        '_worker',
+    )
+
+    def __init__(self) -> None:
         self.throttle = ThrottleController()
         self.steering = SteeringController()
         # Configure safety gates to allow motion
@@ -24,26 +42,114 @@ class VehicleController:
             self.throttle.update_power_lock(False)
         except Exception:
             pass
+        # Single-slot mailbox drained by the actuator thread
+        self._latest_cmd: Optional[Tuple[int, int]] = None
+        self._cmd_lock = threading.Lock()
+        self._cmd_event = threading.Event()
+        self._hw_lock = threading.Lock()
+        self._running = False
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the actuator thread that applies commands posted via submit()."""
+        if self._worker is not None:
+            return
+        self._running = True
+        self._worker = threading.Thread(target=self._run, name="vehicle-actuator", daemon=True)
+        self._worker.start()
+
+    def submit(self, throttle_cmd: float, steering_cmd: float) -> None:
+        """Post the latest command without touching hardware; overwrites any pending one."""
+        # Clamp before scaling so out-of-range floats cannot overflow the int conversion;
+        # submit_raw's consumers clamp again in the integer domain. NaN maps to neutral.
+        t = float(throttle_cmd)
+        if t != t:
+            t = 0.0
+        elif t > 1.0:
+            t = 1.0
+        elif t < -1.0:
+            t = -1.0
+        s = float(steering_cmd)
+        if s != s:
+            s = 0.0
+        elif s > 1.0:
+            s = 1.0
+        elif s < -1.0:
+            s = -1.0
+        self.submit_raw(int(round(t * 1000.0)), int(round(s * 1000.0)))
+
+    def submit_raw(self, thr_i16: int, ste_i16: int) -> None:
+        """Like submit(), with wire values scaled by 1000 (-1000 .. 1000)."""
+        with self._cmd_lock:
+            self._latest_cmd = (thr_i16, ste_i16)
+        self._cmd_event.set()
+
+    def _run(self) -> None:
+        min_interval = 1.0 / self.MAX_UPDATE_HZ
+        next_write = 0.0
+        while True:
+            # A throttle change deferred by the ESC rate gate must still be written
+            # even if no further command arrives, so wake up when it becomes due
+            self._cmd_event.wait(self.throttle.pending_write_delay())
+            self._cmd_event.clear()
+            if not self._running:
+                break
+            delay = next_write - time.monotonic()
+            if delay > 0:
+                # Commands arriving meanwhile replace the pending one
+                time.sleep(delay)
+            # Take the command under _hw_lock so a concurrent stop() either runs
+            # before (and discards it) or after (and overrides it)
+            with self._hw_lock:
+                with self._cmd_lock:
+                    cmd = self._latest_cmd
+                    self._latest_cmd = None
+                if cmd is not None:
+                    self.throttle.set_throttle_raw(cmd[0])
+                    self.steering.set_steering_raw(cmd[1])
+                elif self.throttle.pending_write_delay() is None:
+                    continue
+                self.throttle.apply_throttle(rate_limited=True)
+                self.steering.apply_steering()
+            next_write = time.monotonic() + min_interval
+
+    def _stop_worker(self) -> None:
+        worker = self._worker
+        if worker is None:
+            return
+        self._running = False
+        self._cmd_event.set()
+        worker.join(timeout=1.0)
+        self._worker = None
 
     def update(self, throttle_cmd: float, steering_cmd: float) -> None:
-        # Clamp inputs to [-1, 1]
-        t = max(-1.0, min(1.0, float(throttle_cmd)))
-        s = max(-1.0, min(1.0, float(steering_cmd)))
-        # Update controllers
-        self.throttle.set_throttle(t)
-        self.steering.set_steering(s)
+        # Update controllers (each clamps its input to [-1, 1])
+        self.throttle.set_throttle(throttle_cmd)
+        self.steering.set_steering(steering_cmd)
         # Apply to hardware
         self.throttle.apply_throttle()
         self.steering.apply_steering()
 
+    def update_raw(self, thr_i16: int, ste_i16: int) -> None:
+        """Like update(), with wire values scaled by 1000; stays on the integer path."""
+        self.throttle.set_throttle_raw(thr_i16)
+        self.steering.set_steering_raw(ste_i16)
+        self.throttle.apply_throttle()
+        self.steering.apply_steering()
+
     def stop(self) -> None:
         try:
-            self.throttle.stop_vehicle()
-            self.steering.center_steering()
+            with self._hw_lock:
+                # Drop any pending command so it cannot override the stop
+                with self._cmd_lock:
+                    self._latest_cmd = None
+                self.throttle.stop_vehicle()
+                self.steering.center_steering()
         except Exception:
             pass
 
     def cleanup(self) -> None:
+        self._stop_worker()
         try:
             self.throttle.cleanup()
             self.steering.cleanup()
@@ -1,11 +1,35 @@
 import argparse
 import asyncio
+import logging
 from typing import Any, Dict, Optional
 
 import socketio
 from aiortc import RTCPeerConnection, RTCSessionDescription
 from aiortc.contrib.signaling import BYE
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Acknowledge one binary frame out of every ACK_EVERY received
+ACK_EVERY = 8
+
+
+class _OrjsonJson:
+    """json-module stand-in backed by orjson, for python-socketio/engineio packet (de)serialization."""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        # orjson always emits compact output, which is what `separators=(',', ':')` asks for
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 
 class TextRtcClient:
     def __init__(self, base_url: str, room_id: str, name: str) -> None:
@@ -15,6 +39,7 @@ class TextRtcClient:
 
         self.pc: RTCPeerConnection = RTCPeerConnection()
         self.channel = None
+        self._ack_counter: int = 0
 
         # Perfect negotiation flags
         self.making_offer: bool = False
@@ -22,8 +47,11 @@ class TextRtcClient:
         self.polite: bool = False
         self.initiator: bool = False
 
-        # Socket.IO async client
-        self.sio = socketio.AsyncClient(reconnection=True)
+        # Set while iceGatheringState == "complete"
+        self._ice_complete = asyncio.Event()
+
+        # Socket.IO async client (SDP blobs decode faster with orjson when installed)
+        self.sio = socketio.AsyncClient(reconnection=True, json=_OrjsonJson if orjson is not None else None)
 
         # Wire RTCPeerConnection events
         @self.pc.on("negotiationneeded")
@@ -31,6 +59,12 @@ class TextRtcClient:
             await self._negotiate()
 
         # Note: we rely on non-trickle by sending SDP after ICE gathering completes.
+        @self.pc.on("icegatheringstatechange")
+        def on_icegatheringstatechange() -> None:
+            if self.pc.iceGatheringState == "complete":
+                self._ice_complete.set()
+            else:
+                self._ice_complete.clear()
 
         @self.pc.on("iceconnectionstatechange")
         async def on_iceconnectionstatechange() -> None:
@@ -119,10 +153,14 @@ class TextRtcClient:
         @self.channel.on("message")
         def on_message(message: Any) -> None:  # type: ignore[no-redef]
             if isinstance(message, (bytes, bytearray, memoryview)):
-                b = bytes(message)
-                print(f"[dc] rx {len(b)} bytes: ", b.hex(" "))
-                # send back acknowledgment: single null byte
-                self.channel.send(b"\x00")
+                # bytes, bytearray and memoryview all support len() and .hex(): no copy needed
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[dc] rx %d bytes: %s", len(message), message.hex(" "))
+                # send back acknowledgment (single null byte), coalesced to one per ACK_EVERY frames
+                self._ack_counter += 1
+                if self._ack_counter >= ACK_EVERY:
+                    self._ack_counter = 0
+                    self.channel.send(b"\x00")
             else:
                 print(f"[dc] rx text: {message}")
 
@@ -144,10 +182,12 @@ class TextRtcClient:
 
     async def _wait_ice_gathering_complete(self) -> None:
         # Wait until ICE gathering completes so SDP includes candidates (non-trickle style)
-        for _ in range(50):
-            if self.pc.iceGatheringState == "complete":
-                return
-            await asyncio.sleep(0.1)
+        if self.pc.iceGatheringState == "complete":
+            return
+        try:
+            await asyncio.wait_for(self._ice_complete.wait(), timeout=5.0)
+        except asyncio.TimeoutError:
+            print("[rtc] ICE gathering not complete after 5s, sending SDP anyway")
 
     async def run(self) -> None:
         await self.sio.connect(self.base_url, transports=["websocket", "polling"])  # allow fallback
@@ -176,14 +216,25 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--base-url", default="https://picar-e09b89d86d10.herokuapp.com", help="Signaling server base URL")
     parser.add_argument("--room-id", required=True, help="Room id to join")
     parser.add_argument("--name", default="python", help="Client name tag")
+    parser.add_argument("--debug", action="store_true", help="Log every received data-channel frame")
     return parser.parse_args()
 
 
 async def main() -> None:
     args = parse_args()
+    # Default WARNING level keeps aiortc/aioice INFO chatter off the console
+    logging.basicConfig()
+    if args.debug:
+        logger.setLevel(logging.DEBUG)
     client = TextRtcClient(base_url=args.base_url, room_id=args.room_id, name=args.name)
     await client.run()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # Prefer libuv's event loop where available (not on Windows); stdlib asyncio otherwise
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())